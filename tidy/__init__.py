@@ -3,9 +3,14 @@ The core ``git-tidy`` functions and classes that are utilized by
 the :ref:`cli`.
 """
 
-from tidy.core import Commit, CommitRange, Commits, Tag, commit, lint, log, squash
+import importlib
+from typing import TYPE_CHECKING
+
 from tidy.version import __version__
 
+if TYPE_CHECKING:
+    from tidy.core import Commit, CommitRange, Commits, Tag, commit, lint, log, squash
+
 __all__ = [
     "commit",
     "lint",
@@ -17,3 +22,12 @@ __all__ = [
     "Tag",
     "__version__",
 ]
+
+
+def __getattr__(name):
+    # The core API is imported on first access so that importing the CLI
+    # does not load jinja2, yaml, and formaldict
+    if name in __all__:
+        return getattr(importlib.import_module("tidy.core"), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,7 @@
+"""
+Runs the ``git-tidy`` command with ``python -m tidy``
+"""
+
+from tidy.cli import tidy
+
+tidy(prog_name="git-tidy")
@@ -10,27 +10,37 @@ Commands
 * ``git-tidy-log`` - Renders templated commit messages
 * ``git-tidy-lint`` - Validates structure of commit messages
 * ``git-tidy-squash`` - Squashes commit messages into a single tidy commit
+
+The commit, lint, log, and squash commands are also subcommands of
+``git-tidy`` (e.g. ``git tidy lint``).
 """
 
 import sys
 
 import click
-import pkg_resources
 
-from tidy import core
+from tidy.version import __version__
 
+# NOTE: tidy.core is imported inside of the commands that use it so that
+# printing the version or command help does not load its dependencies
 
-@click.command()
+
+@click.group(invoke_without_command=True)
 @click.option("--template", help="Show tidy commit template.", is_flag=True)
 @click.option("-o", "--output", help="Output file name of the commit template.")
-def tidy(template, output):
+@click.pass_context
+def tidy(ctx, template, output):
     """
     Print version information about ``git-tidy`` or show the tidy commit
     template.
     """
-    if not template:
-        click.echo(f'git-tidy {pkg_resources.get_distribution("git-tidy").version}')
+    if ctx.invoked_subcommand:
+        return
+    elif not template:
+        click.echo(f"git-tidy {__version__}")
     else:
+        from tidy import core
+
         core.commit_template(output=output or sys.stdout)
 
 
@@ -42,6 +52,8 @@ def commit(ctx, no_verify, allow_empty):
     """
     Perform a tidy commit.
     """
+    from tidy import core
+
     result = core.commit(no_verify=no_verify, allow_empty=allow_empty)
     ctx.exit(result.returncode)
 
@@ -61,16 +73,17 @@ def lint(ctx, range, any):
     If ``:github/pr`` is provided as the range, the base branch of the pull
     request will be used as the revision range (e.g. ``origin/develop..``).
     """
-    range = " ".join(range)
+    from tidy import core
+
     is_valid, commits = core.lint(range, any=any)
 
     if not is_valid:
         failures = commits.filter("is_valid", False)
         err_msg = f"{len(failures)} out of {len(commits)} commits" f" have failed linting:"
-        click.echo(click.style(err_msg, fg="red"), err=True)
-
-        for failure in failures:
-            click.echo(f"{failure.sha}: {failure.validation_errors}", err=True)
+        # Write the report at once instead of per failing commit
+        report = [click.style(err_msg, fg="red")]
+        report.extend(f"{failure.sha}: {failure.validation_errors}" for failure in failures)
+        click.echo("\n".join(report), err=True)
         ctx.exit(1)
 
 
@@ -98,7 +111,8 @@ def log(range, style, tag_match, before, after, reverse, output):
     If ``:github/pr`` is used as the output target, the log will be written
     as a comment on the current Github pull request.
     """
-    range = " ".join(range)
+    from tidy import core
+
     core.log(
         range,
         style=style,
@@ -122,5 +136,11 @@ def squash(ctx, ref, no_verify, allow_empty):
     If ``:github/pr`` is provided as the ref, the base branch of the pull
     request will be used (e.g. ``origin/develop``).
     """
+    from tidy import core
+
     commit_result = core.squash(ref, no_verify=no_verify, allow_empty=allow_empty)
     ctx.exit(commit_result.returncode)
+
+
+for command in [commit, lint, log, squash]:
+    tidy.add_command(command)
@@ -5,14 +5,16 @@ The core git tidy API
 from __future__ import annotations
 
 import collections.abc
-import io
+import datetime
+import errno
+import functools
+import itertools
 import os
 import re
+import shlex
 import subprocess
-import tempfile
-from typing import TYPE_CHECKING
+import weakref
 
-import dateutil.parser
 import formaldict
 import jinja2
 import yaml
@@ -20,9 +22,6 @@ from packaging import version
 
 from tidy import exceptions, github, utils
 
-if TYPE_CHECKING:
-    from datetime import datetime
-
 # The default tidy log Jinja template
 DEFAULT_LOG_TEMPLATE = """
 {% for tag, commits_by_tag in commits.group('tag').items() %}
@@ -39,8 +38,24 @@ DEFAULT_LOG_TEMPLATE = """
 """
 # Used for parsing descriptions from git commits and excluding trailers
 REGEX_RFC822_POSTFIX = r"((^|\n)(?P<key>[A-Z]\w+(-\w+)*):(?P<value>[^\n]*(\n\s+[^\n]*)*))+$"
+_RFC822_POSTFIX_RE = re.compile(REGEX_RFC822_POSTFIX)
 # The special range value for git ranges against github pull requests
 GITHUB_PR = ":github/pr"
+# Parse YAML with libyaml when PyYAML is built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+# The commit attributes rendered by "git log" and their formats. Fields are
+# separated by NUL bytes, which git does not allow in any of them
+_GIT_LOG_FIELDS = {
+    "sha": "%H",
+    "author_name": "%an",
+    "author_email": "%ae",
+    "author_date": "%ad",
+    "committer_name": "%cn",
+    "committer_email": "%ce",
+    "committer_date": "%cd",
+    "msg": "%B",
+    "trailers": "%(trailers:only,unfold)",
+}
 
 
 def _output(*, value, path):
@@ -66,6 +81,14 @@ def _output(*, value, path):
         path.flush()
 
 
+def _mtime_ns(path):
+    """Returns the modification time of a path or ``None`` if it doesn't exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
 def _load_commit_schema(path=None, full=True):
     """Loads the tidy schema
 
@@ -74,7 +97,15 @@ def _load_commit_schema(path=None, full=True):
     are needed when linting/logging the commits
     """
     path = path or utils.get_tidy_file_path("commit.yaml")
+    return _parse_commit_schema(path, full, _mtime_ns(path))
+
 
+@functools.lru_cache(maxsize=8)
+def _parse_commit_schema(path, full, schema_mtime):
+    """
+    Parses the tidy schema at a path. Schemas are cached until the schema
+    file is modified
+    """
     default_schema = [
         {
             "label": "summary",
@@ -140,7 +171,7 @@ def _load_commit_schema(path=None, full=True):
 
     try:
         with open(path, "r") as schema_f:
-            user_schema = yaml.safe_load(schema_f)
+            user_schema = yaml.load(schema_f, Loader=_YAML_LOADER)
     except IOError:
         user_schema = []
 
@@ -162,9 +193,10 @@ def _load_commit_schema(path=None, full=True):
     return formaldict.Schema(schema)
 
 
+@functools.lru_cache(maxsize=None)
 def _check_git_version():
-    """Verify git version"""
-    git_version_out = utils.shell_stdout("git --version").split(" ")
+    """Verify git version. Only checked once per process"""
+    git_version_out = utils.shell_stdout(["git", "--version"]).split(" ")
     assert len(git_version_out) >= 2
     git_version = git_version_out[2]
 
@@ -172,20 +204,30 @@ def _check_git_version():
         raise RuntimeError(f"Must have git version >= 2.22.0 (version = {git_version})")
 
 
+@functools.lru_cache(maxsize=256)
+def _trailer_attr(trailer_key):
+    """
+    Converts a trailer key into a commit attribute name (e.g. "Trailer-One"
+    becomes "trailer_one"). The same few trailer keys are used by almost
+    every commit, so conversions are cached
+    """
+    return trailer_key.strip().lower().replace("-", "_")
+
+
 def _format_commit_attr(key, value):
     """
-    After parsing commits into yaml, format the values of the parsed
+    After parsing commits from the git log, format the values of the parsed
     key/value pairs
     """
     if key == "trailers":
         value = {
-            trailer_key.strip().lower().replace("-", "_"): trailer_value.strip()
+            _trailer_attr(trailer_key): trailer_value.strip()
             for trailer in value
             for trailer_key, trailer_value in trailer.items()
         }
     elif key == "description":
         # Remove trailers from the description
-        match = re.search(REGEX_RFC822_POSTFIX, value)
+        match = _RFC822_POSTFIX_RE.search(value)
         if match is not None:
             description_end = match.start()
             value = value[:description_end].strip()
@@ -196,14 +238,109 @@ def _format_commit_attr(key, value):
     return value
 
 
+def _split_commit_msg(msg):
+    """
+    Split a commit message into its summary and description like git's "%s"
+    and "%b" formats. Paragraphs are separated by blank or whitespace-only
+    lines, and lines of the first paragraph are joined into the summary
+    """
+    lines = msg.replace("\r\n", "\n").strip().split("\n")
+    summary_lines = list(itertools.takewhile(str.strip, lines))
+    summary = " ".join(line.strip() for line in summary_lines)
+    description = "\n".join(lines[len(summary_lines) :])
+    return summary, description.strip()
+
+
+def _parse_trailers(trailers):
+    """Parse the unfolded trailers of a commit into a list of key/value pairs"""
+    parsed = []
+    for line in trailers.splitlines():
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f'Invalid trailer "{line}"')
+
+        parsed.append({key: value})
+
+    return parsed
+
+
+class _CatFileBatch:
+    """
+    A persistent ``git cat-file --batch`` process for reading git objects.
+
+    Revisions are written to the process's stdin and objects are read back
+    from the ``<sha> <type> <size>\\n<payload>\\n`` frames on its stdout,
+    so any number of object lookups only spawns one git process. The process
+    is started on the first read and can be used as a context manager.
+    """
+
+    def __init__(self):
+        self._proc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read(self, rev):
+        """
+        Read the contents of an object.
+
+        Returns:
+            bytes: The object contents or ``None`` if the object is missing.
+        """
+        if self._proc is None:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+
+        self._proc.stdin.write(f"{rev}\n".encode())
+        self._proc.stdin.flush()
+
+        # Missing or ambiguous objects are reported as "<rev> missing"
+        header = self._proc.stdout.readline().split()
+        if len(header) != 3:
+            return None
+
+        # The payload is always followed by a newline
+        return self._proc.stdout.read(int(header[2]) + 1)[:-1]
+
+    def close(self):
+        """Stop the git process if it is running"""
+        if self._proc is not None:
+            self._proc.stdin.close()
+            self._proc.stdout.close()
+            self._proc.wait()
+            self._proc = None
+
+
+def _parse_author_date(commit_obj):
+    """Parse the author date from the contents of a git commit object"""
+    headers = commit_obj.partition(b"\n\n")[0]
+    for line in headers.split(b"\n"):
+        if line.startswith(b"author "):
+            timestamp, offset = line.rsplit(b" ", 2)[1:]
+            offset_minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+            tz = datetime.timezone(
+                datetime.timedelta(
+                    minutes=-offset_minutes if offset[:1] == b"-" else offset_minutes
+                )
+            )
+            return datetime.datetime.fromtimestamp(int(timestamp), tz=tz)
+
+
 class Tag(collections.UserString):
     """A git tag."""
 
-    def __init__(self, tag):
+    def __init__(self, tag, cat_file=None):
         self.data = tag
+        self._cat_file = cat_file
 
     @classmethod
-    def from_sha(cls, sha, tag_match=None) -> Tag:
+    def from_sha(cls, sha, tag_match=None, cat_file=None) -> Tag:
         """
         Create a Tag object from a sha or return None if there is no
         associated tag
@@ -211,61 +348,129 @@ class Tag(collections.UserString):
         Returns:
             A constructed tag or ``None`` if no tags contain the commit.
         """
-        describe_cmd = f"git describe {sha} --contains"
+        describe_cmd = ["git", "describe", sha, "--contains"]
         if tag_match:
-            describe_cmd += f" --match={tag_match}"
+            describe_cmd.append(f"--match={tag_match}")
 
         rev = (
-            utils.shell_stdout(describe_cmd, check=False, stderr=subprocess.PIPE)
+            utils.shell_stdout(describe_cmd, check=False, stderr=subprocess.DEVNULL)
             .replace("~", ":")
             .replace("^", ":")
         )
-        return cls(rev.split(":")[0]) if rev else None
+        return cls(rev.split(":")[0], cat_file=cat_file) if rev else None
 
-    @property
-    def date(self) -> datetime:
+    @functools.cached_property
+    def date(self) -> datetime.datetime:
         """
         Parse the date of the tag
 
         Returns:
-            datetime: The tag parsed as a datetime object.
+            datetime: The author date of the tagged commit.
         """
-        if not hasattr(self, "_date"):
-            try:
-                self._date = dateutil.parser.parse(
-                    utils.shell_stdout(f"git log -1 --format=%ad {self}")
-                )
-            except dateutil.parser.ParserError:
-                self._date = None
+        rev = f"{self}^{{commit}}"
+        if self._cat_file:
+            commit_obj = self._cat_file.read(rev)
+        else:
+            with _CatFileBatch() as cat_file:
+                commit_obj = cat_file.read(rev)
+
+        return _parse_author_date(commit_obj) if commit_obj else None
+
+
+class _ContainingTags:
+    """
+    Finds the tags that contain the commits of a range.
+
+    ``git describe --contains`` names a commit with ``git name-rev``, which
+    can name many commits in one call. The tags of all commits are found the
+    first time any of them is looked up, and commits that are contained by
+    the same tag share one `Tag`.
+    """
 
-        return self._date
+    # The number of commits named per "git name-rev" call. Every call walks
+    # history from all tags, so batches are as large as possible while staying
+    # under the 32,767 character command line limit of Windows (41 characters
+    # per sha argument)
+    batch_size = 700
+
+    def __init__(self, shas, tag_match=None, cat_file=None):
+        self._shas = shas
+        self._tag_match = tag_match
+        self._cat_file = cat_file
+        self._tags_by_sha = None
+
+    def _name_revs(self):
+        name_rev_cmd = ["git", "name-rev", "--peel-tag", "--name-only", "--tags"]
+        if self._tag_match:
+            name_rev_cmd.append(f"--refs=refs/tags/{self._tag_match}")
+
+        tags_by_name = {}
+        tags_by_sha = {}
+        for i in range(0, len(self._shas), self.batch_size):
+            shas = self._shas[i : i + self.batch_size]
+            revs = utils.shell_stdout([*name_rev_cmd, *shas]).split("\n")
+            for sha, rev in zip(shas, revs):
+                # Commits that aren't contained by a tag are "undefined"
+                if rev == "undefined":
+                    tags_by_sha[sha] = None
+                else:
+                    name = re.split(r"[~^]", rev)[0]
+                    if name not in tags_by_name:
+                        tags_by_name[name] = Tag(name, cat_file=self._cat_file)
+
+                    tags_by_sha[sha] = tags_by_name[name]
+
+        return tags_by_sha
+
+    def __getitem__(self, sha):
+        """Returns the `Tag` that contains the commit or ``None``"""
+        if self._tags_by_sha is None:
+            self._tags_by_sha = self._name_revs()
+
+        return self._tags_by_sha[sha]
 
 
 class Commit(collections.UserString):
     """
     Parses a commit message into structured components.
 
-    It is assumed the commit message is formatted as YAML by
+    It is assumed the commit is given as the raw fields rendered by
     the appropriate "git log" command (see `CommitRange`).
     If data is able to be parsed, attributes of the commit
     can be accessed as attributes of this object. For example, a
     ``type`` attribute in the schema is accessible as
     ``Commit().type``.
 
-    If the commit cannot be parsed as valid YAML for unexpected
-    reasons, ``is_parsed`` is ``False`` and only a limited amount of
-    attributes are available.
-    """
+    If the commit cannot be parsed for unexpected reasons (such as
+    a message that is not valid UTF-8), ``is_parsed`` is ``False``
+    and only a limited amount of attributes are available.
 
-    def __init__(self, msg, schema, tag_match=None):
-        msg = msg.strip()
+    Commits are decoded and parsed the first time their attributes
+    are accessed.
+    """
 
+    def __init__(self, fields, schema, tag_match=None, cat_file=None, tags=None):
+        self._fields = fields
         self._schema = schema
-        self.data = msg
         self._tag_match = tag_match
+        self._cat_file = cat_file
+        self._tags = tags
+
+    @functools.cached_property
+    def data(self):
+        return self._fields["msg"].decode(errors="replace").strip()
+
+    @functools.cached_property
+    def _parsed(self):
+        """Parses the commit into a tuple of its schema data and parse status"""
+        schema = self._schema
 
         try:
-            commit_data = yaml.safe_load(io.StringIO(msg))
+            commit_data = {key: value.decode() for key, value in self._fields.items()}
+            commit_data["summary"], commit_data["description"] = _split_commit_msg(
+                commit_data.pop("msg")
+            )
+            commit_data["trailers"] = _parse_trailers(commit_data["trailers"])
 
             # Format commit attributes
             commit_data = {
@@ -279,34 +484,36 @@ class Commit(collections.UserString):
             }
 
             # Parse the commit data
-            self.schema_data = schema.parse(commit_data)
-            self._is_parsed = True
+            return schema.parse(commit_data), True
         except Exception as exc:
-            # If the yaml data cannot be parsed, construct a special
+            # If the commit cannot be parsed, construct a special
             # formal dictionary object with an appropriate error
-            match = re.match(r"sha: (?P<sha>[a-fA-F\d]+)\n", msg)
-            sha = match.group("sha")
+            sha = self._fields["sha"].decode()
             errors = formaldict.Errors()
             errors.add(exceptions.CommitParseError(str(exc)))
 
-            self.schema_data = formaldict.FormalDict(
+            schema_data = formaldict.FormalDict(
                 schema=schema,
                 parsed={"sha": sha},
                 data={"sha": sha},
                 errors=errors,
             )
-            self._is_parsed = False
-
-    def __getattribute__(self, attr):
-        try:
-            return object.__getattribute__(self, attr)
-        except AttributeError:
-            if self.schema_data and attr in self.schema_data:
-                return self.schema_data[attr]
-            elif attr in self._schema:
-                return None
-            else:
-                raise
+            return schema_data, False
+
+    def __getattr__(self, attr):
+        # Only called when normal attribute lookup fails. Private attributes
+        # are never schema attributes, which also prevents recursion when
+        # they are accessed before being set
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        schema_data = self.schema_data
+        if schema_data and attr in schema_data:
+            return schema_data[attr]
+        elif attr in self._schema:
+            return None
+        else:
+            raise AttributeError(attr)
 
     @property
     def is_parsed(self):
@@ -315,7 +522,12 @@ class Commit(collections.UserString):
         If ``False``, only the ``sha`` and ``msg`` attributes
         are available.
         """
-        return self._is_parsed
+        return self._parsed[1]
+
+    @property
+    def schema_data(self):
+        """The parsed ``formaldict.FormalDict`` of commit attributes"""
+        return self._parsed[0]
 
     @property
     def is_valid(self):
@@ -339,13 +551,27 @@ class Commit(collections.UserString):
         """The raw git commit message"""
         return self.data
 
-    @property
+    @functools.cached_property
     def tag(self):
         """Returns a `Tag` that contains the commit"""
-        if not hasattr(self, "_tag"):
-            self._tag = Tag.from_sha(self.sha, tag_match=self._tag_match)
+        if self._tags is not None:
+            return self._tags[self.sha]
+        else:
+            return Tag.from_sha(self.sha, tag_match=self._tag_match, cat_file=self._cat_file)
 
-        return self._tag
+
+@functools.lru_cache(maxsize=32)
+def _compile_pattern(pattern):
+    """
+    Compiles a regex pattern once for all commits that are matched against it.
+    Returns a function that is True when a string matches the pattern
+    """
+    if re.escape(pattern) == pattern:
+        # Patterns without special characters only match the start of strings
+        return lambda value: value.startswith(pattern)
+
+    match_pattern = re.compile(pattern).match
+    return lambda value: match_pattern(value) is not None
 
 
 def _equals(a, b, match=False):
@@ -354,7 +580,12 @@ def _equals(a, b, match=False):
     If b is a regex ``Pattern``, applies regex matching
     """
     if match:
-        return re.match(b, a) is not None if isinstance(a, str) else False
+        if not isinstance(a, str):
+            return False
+        elif isinstance(b, re.Pattern):
+            return b.match(a) is not None
+        else:
+            return _compile_pattern(b)(a)
     else:
         return a == b
 
@@ -369,7 +600,8 @@ class Commits(collections.abc.Sequence):
     """
 
     def __init__(self, commits):
-        self._commits = commits
+        self._commits = tuple(commits)
+        self._cache = {}
 
     def __getitem__(self, i):
         return self._commits[i]
@@ -377,20 +609,51 @@ class Commits(collections.abc.Sequence):
     def __len__(self):
         return len(self._commits)
 
+    def _cached(self, key, compute):
+        """
+        Memoize the result of a query. Commits never change once they are
+        collected, so results stay valid for the life of the collection
+        """
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable query arguments can't be cached
+            return compute()
+
+        if key not in self._cache:
+            self._cache[key] = compute()
+
+        return self._cache[key]
+
+    def _column(self, attr):
+        """
+        Returns the values of an attribute for every commit. Values are
+        looked up once per attribute and shared by all filters and groups
+        """
+        return self._cached(
+            ("column", attr), lambda: tuple(getattr(commit, attr) for commit in self._commits)
+        )
+
     def filter(self, attr, value, match=False) -> Commits:
         """Filter commits by an attribute
 
         Args:
             attr (str): The name of the attribute on the `Commit` object.
-            value (str|bool): The value to filter by.
+            value (str|bool|re.Pattern): The value to filter by.
             match (bool, default=False): Treat ``value`` as a regex pattern and
-                match against it.
+                match against it. ``value`` can also be an already-compiled
+                ``re.Pattern``.
 
         Returns:
             The filtered commits.
         """
-        return Commits(
-            [commit for commit in self if _equals(getattr(commit, attr), value, match=match)]
+        return self._cached(
+            ("filter", attr, value, match),
+            lambda: Commits(
+                commit
+                for commit, commit_value in zip(self._commits, self._column(attr))
+                if _equals(commit_value, value, match=match)
+            ),
         )
 
     def exclude(self, attr, value, match=False) -> Commits:
@@ -398,15 +661,21 @@ class Commits(collections.abc.Sequence):
 
         Args:
             attr (str): The name of the attribute on the `Commit` object.
-            value (str|bool): The value to exclude by.
+            value (str|bool|re.Pattern): The value to exclude by.
             match (bool, default=False): Treat ``value`` as a regex pattern and
-                match against it.
+                match against it. ``value`` can also be an already-compiled
+                ``re.Pattern``.
 
         Returns:
             The excluded commits.
         """
-        return Commits(
-            [commit for commit in self if not _equals(getattr(commit, attr), value, match=match)]
+        return self._cached(
+            ("exclude", attr, value, match),
+            lambda: Commits(
+                commit
+                for commit, commit_value in zip(self._commits, self._column(attr))
+                if not _equals(commit_value, value, match=match)
+            ),
         )
 
     def group(
@@ -431,14 +700,27 @@ class Commits(collections.abc.Sequence):
         Returns:
             A dictionary of `Commits` keyed on groups.
         """
+        groups = self._cached(
+            ("group", attr, ascending_keys, descending_keys, none_key_first, none_key_last),
+            lambda: self._group(
+                attr, ascending_keys, descending_keys, none_key_first, none_key_last
+            ),
+        )
+
+        # Return a copy so that callers can't modify the cached groups
+        return collections.OrderedDict(groups)
+
+    def _group(self, attr, ascending_keys, descending_keys, none_key_first, none_key_last):
         if any([ascending_keys, descending_keys]) and not any([none_key_first, none_key_last]):
             # If keys are sorted, default to making the "None" key last
             none_key_last = True
 
-        # Get the natural ordering of the keys
-        keys = list(
-            collections.OrderedDict((getattr(commit, attr), True) for commit in self).keys()
-        )
+        # Bucket the commits in one pass, keeping the natural ordering of the keys
+        groups = collections.OrderedDict()
+        for commit, commit_value in zip(self._commits, self._column(attr)):
+            groups.setdefault(commit_value, []).append(commit)
+
+        keys = list(groups)
 
         # Re-sort the keys
         if any([ascending_keys, descending_keys]):
@@ -453,72 +735,109 @@ class Commits(collections.abc.Sequence):
             keys.remove(None)
             keys.insert(0 if none_key_first else len(keys), None)
 
-        return collections.OrderedDict((key, self.filter(attr, key)) for key in keys)
+        return collections.OrderedDict((key, Commits(groups[key])) for key in keys)
 
 
-def _get_pull_request_range():
+# Environment variables that identify a Github Actions job run
+_GITHUB_JOB_ENV_VARS = (
+    "GITHUB_REPOSITORY",
+    "GITHUB_REF",
+    "GITHUB_RUN_ID",
+    "GITHUB_RUN_ATTEMPT",
+    "GITHUB_JOB",
+)
+
+
+def _get_pull_request_base():
+    """
+    Returns the base branch of the pull request opened from the current
+    branch.
+
+    When running in Github Actions, the base is also stored in the git
+    directory so that other git-tidy commands in the same job don't need
+    to call the Github API again. The stored base is keyed on the job run,
+    since the git directory can outlive a job on persistent runners.
+    """
+    ci_key = None
+    if all(os.environ.get(env_var) for env_var in _GITHUB_JOB_ENV_VARS):
+        ci_key = " ".join(os.environ[env_var] for env_var in _GITHUB_JOB_ENV_VARS)
+        cache_path = utils.shell_stdout(["git", "rev-parse", "--git-path", "tidy-pr-base"])
+        try:
+            with open(cache_path) as f:
+                cached_key, base = f.read().split("\n")
+            if cached_key == ci_key:
+                return base
+        except (IOError, ValueError):
+            pass
+
     base = github.get_pull_request_base()
+
+    if ci_key:
+        # Storing the base is an optimization, so failures are ignored
+        try:
+            with open(cache_path, "w") as f:
+                f.write(f"{ci_key}\n{base}")
+        except OSError:
+            pass
+
+    return base
+
+
+def _get_pull_request_range():
+    base = _get_pull_request_base()
     return f"{base}.."
 
 
-def _git_log_as_yaml(git_log_cmd):
+# The number of bytes read from "git log" at a time
+_GIT_LOG_CHUNK_SIZE = 1 << 16
+
+
+def _git_log(git_log_cmd):
     """
-    Outputs git log in a format parseable as YAML.
+    Outputs the raw fields of every commit in the git log.
 
     Args:
-        git_log_cmd (str): The primary "git log .." command.
-            This function adds the "--format" parameter to
-            it and cleans the resulting log.
+        git_log_cmd (List[str]): The arguments of the primary "git log .."
+            command. This function adds the "-z" and "--format" parameters
+            to it.
 
-    Returns:
-        List[str]: The "git log" return value where every line can
-        be parsed as YAML.
-    """
-    # NOTE(@wesleykendall) - The git log is rendered as YAML so that it
-    # can be parsed as key/value pairs. There are some circumstances
-    # that are not fixed where the log cannot be parsed as YAML
-    # (e.g. having a trailer value start with a ":"). git-tidy still
-    # provides the ability to filter unparsed commits.
-    #
-    # We assume the parsed commit always has the following keys:
-    # sha: The full commit sha (%H). Must always be rendered first
-    # author_name: The author name (%an)
-    # author_email: The author email (%ae)
-    delimiter = "\n<-------->"
-
-    git_log_cmd = (
-        f"{git_log_cmd} "
-        '--format="'
-        "sha: %H%n"
-        "author_name: %an%n"
-        "author_email: %ae%n"
-        "author_date: %ad%n"
-        "committer_name: %cn%n"
-        "committer_email: %ce%n"
-        "committer_date: %cd%n"
-        "summary: |%n%w(0, 4, 4)%s%n%w(0, 0, 0)"
-        "description: |%n%w(0, 4, 4)%b%n%w(0, 0, 0)"
-        "trailers: [*{*%(trailers:separator=*%x7d*%x2c*%x7b*)*}*]"
-        f'%n{delimiter}"'
-    )
-    git_log_stdout = utils.shell_stdout(git_log_cmd)
-
-    # Escape any double quotes used in trailers
-    git_log_stdout = re.sub(
-        r"^trailers:.*$",
-        lambda x: x.group().replace('"', r"\""),
-        git_log_stdout,
-        flags=re.MULTILINE,
-    )
-    # Format all empty trailer dictionaries. This only happens when
-    # there are no trailers
-    git_log_stdout = re.sub(r"\*{\*\*}\*", r"{}", git_log_stdout)
-
-    # Quote all trailer values
-    git_log_stdout = re.sub(r"\*{\*([\w\-]+: )", r'{\1"', git_log_stdout)
-    git_log_stdout = re.sub(r"\*}\*", r'"}', git_log_stdout)
+    Yields:
+        dict: The ``_GIT_LOG_FIELDS`` of every commit as undecoded bytes.
+        Fields are only decoded when commits are parsed.
 
-    return [msg for msg in git_log_stdout.split(delimiter) if msg]
+    Raises:
+        subprocess.CalledProcessError: If "git log" fails.
+    """
+    # Fields are separated by NUL bytes and "-z" terminates every commit
+    # with another NUL byte, so the log can be split without decoding it.
+    # Since NUL bytes cannot appear in commits, no message can break the
+    # parsing of other commits.
+    git_log_cmd = [*git_log_cmd, "-z", "--format=" + "%x00".join(_GIT_LOG_FIELDS.values())]
+    num_fields = len(_GIT_LOG_FIELDS)
+
+    # Commits are split from the output as git produces it instead of
+    # buffering the entire log
+    with subprocess.Popen(git_log_cmd, stdout=subprocess.PIPE) as proc:
+        fields = []
+        # Pieces of a field that spans chunks. Only new chunks are searched
+        # for NUL bytes, so long fields aren't copied and scanned repeatedly
+        partial_field = []
+        for chunk in iter(functools.partial(proc.stdout.read1, _GIT_LOG_CHUNK_SIZE), b""):
+            *complete_fields, rest = chunk.split(b"\0")
+            if complete_fields:
+                partial_field.append(complete_fields[0])
+                complete_fields[0] = b"".join(partial_field)
+                partial_field = []
+
+            partial_field.append(rest)
+            for field in complete_fields:
+                fields.append(field)
+                if len(fields) == num_fields:
+                    yield dict(zip(_GIT_LOG_FIELDS, fields))
+                    fields = []
+
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, git_log_cmd)
 
 
 class CommitRange(Commits):
@@ -528,7 +847,9 @@ class CommitRange(Commits):
 
     When doing ``git log``, the user can provide a range
     (e.g. "origin/develop.."). Any range used in "git log" can be
-    used as a range to the CommitRange object.
+    used as a range to the CommitRange object. The range can also be
+    given as a sequence of ``git log`` arguments, which are passed to
+    git as-is.
 
     If the special ``:github/pr`` value is used as a range, the Github
     API is used to figure out the range based on a pull request opened
@@ -536,38 +857,132 @@ class CommitRange(Commits):
     """
 
     def __init__(self, range="", tag_match=None, before=None, after=None, reverse=False):
-        self._schema = _load_commit_schema()
-        self._tag_match = tag_match
-        self._before = before
-        self._after = after
-        self._reverse = reverse
-        _check_git_version()
-
-        # The special ":github/pr" range will do a range against the base
-        # pull request branch
-        if range == GITHUB_PR:
-            range = _get_pull_request_range()
-
-        # Ensure any remotes are fetched
-        utils.shell("git --no-pager fetch -q")
-
-        git_log_cmd = f"git --no-pager log {range} --no-merges"
+        # Ensure any remotes are fetched. The fetch runs in the background
+        # while the schema, git version, and range are being prepared
+        fetch_proc = subprocess.Popen(["git", "--no-pager", "fetch", "-q"])
+        try:
+            self._schema = _load_commit_schema()
+            self._tag_match = tag_match
+            self._before = before
+            self._after = after
+            self._reverse = reverse
+            _check_git_version()
+
+            range_args = shlex.split(range) if isinstance(range, str) else list(range)
+
+            # The special ":github/pr" range will do a range against the base
+            # pull request branch
+            if range_args == [GITHUB_PR]:
+                range_args = shlex.split(_get_pull_request_range())
+        finally:
+            fetch_returncode = fetch_proc.wait()
+
+        if fetch_returncode:
+            raise subprocess.CalledProcessError(fetch_returncode, fetch_proc.args)
+
+        # Tag dates are read from one git process that is shared by all
+        # commits in the range and stopped when the range is collected
+        self._cat_file = _CatFileBatch()
+        weakref.finalize(self, self._cat_file.close)
+
+        git_log_cmd = ["git", "--no-pager", "log", *range_args, "--no-merges"]
         if before:
-            git_log_cmd += f" --before={before}"
+            git_log_cmd.append(f"--before={before}")
         if after:
-            git_log_cmd += f" --after={after}"
+            git_log_cmd.append(f"--after={after}")
         if reverse:
-            git_log_cmd += " --reverse"
+            git_log_cmd.append("--reverse")
 
-        git_yaml_logs = _git_log_as_yaml(git_log_cmd)
+        git_logs = list(_git_log(git_log_cmd))
 
-        self._range = range
+        self._range = range_args
+
+        # The tags of all commits are found together when first accessed
+        tags = _ContainingTags(
+            [fields["sha"].decode() for fields in git_logs],
+            tag_match=self._tag_match,
+            cat_file=self._cat_file,
+        )
 
         return super().__init__(
-            [Commit(msg, self._schema, tag_match=self._tag_match) for msg in git_yaml_logs]
+            [
+                Commit(
+                    fields,
+                    self._schema,
+                    tag_match=self._tag_match,
+                    cat_file=self._cat_file,
+                    tags=tags,
+                )
+                for fields in git_logs
+            ]
         )
 
 
+class _GitBytecodeCache(jinja2.FileSystemBytecodeCache):
+    """
+    Stores compiled templates in the git directory of the tidy root so that
+    they are shared across runs but never committed alongside the templates.
+    The directory is only resolved once a template is loaded from the tidy root
+    """
+
+    pattern = "__jinja2_%s.cache"
+
+    def __init__(self, tidy_root):
+        self._tidy_root = tidy_root
+
+    @functools.cached_property
+    def directory(self):
+        git_path = utils.shell_stdout(
+            ["git", "rev-parse", "--git-path", "tidy-jinja-cache"], cwd=self._tidy_root
+        )
+        # The git path is relative to the directory the command ran in
+        directory = os.path.join(self._tidy_root, git_path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            # Templates are simply compiled on every run without a cache
+            return None
+
+        return directory
+
+    def load_bytecode(self, bucket):
+        if self.directory is not None:
+            super().load_bytecode(bucket)
+
+    def dump_bytecode(self, bucket):
+        if self.directory is not None:
+            try:
+                super().dump_bytecode(bucket)
+            except OSError:
+                # Storing compiled templates is only an optimization
+                pass
+
+
+@functools.lru_cache(maxsize=None)
+def _get_template_env(tidy_root):
+    """
+    Returns the Jinja environment shared by the commit and log templates.
+    The environment caches compiled templates and recompiles them when
+    their files are modified
+    """
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(tidy_root),
+        trim_blocks=True,
+        bytecode_cache=_GitBytecodeCache(tidy_root),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _render_commit_template(tidy_root, template_mtime, schema_mtime):
+    """
+    Renders the commit template. Results are memoized on the modification
+    times of the template and schema so that edits to either are picked up.
+    """
+    schema = _load_commit_schema(path=os.path.join(tidy_root, "commit.yaml"), full=False)
+    template = _get_template_env(tidy_root).get_template("commit.tpl")
+    return template.render(schema=schema)
+
+
 def commit_template(output=None):
     """Returns the template for a tidy commit.
 
@@ -581,13 +996,12 @@ def commit_template(output=None):
         output (str|file): Path or file-like object to which the template is
             written.
     """
-    schema = _load_commit_schema(full=False)
-    env = jinja2.Environment(
-        loader=jinja2.FileSystemLoader(utils.get_tidy_file_root()),
-        trim_blocks=True,
+    tidy_root = utils.get_tidy_file_root()
+    rendered = _render_commit_template(
+        tidy_root,
+        template_mtime=_mtime_ns(os.path.join(tidy_root, "commit.tpl")),
+        schema_mtime=_mtime_ns(os.path.join(tidy_root, "commit.yaml")),
     )
-    template = env.get_template("commit.tpl")
-    rendered = template.render(schema=schema)
 
     _output(path=output, value=rendered)
 
@@ -612,19 +1026,27 @@ def commit(no_verify=False, allow_empty=False, defaults=None) -> subprocess.Comp
     """
     # Run pre-commit hooks manually so that the commit will fail
     # before prompting the user for information
-    hooks_path = utils.shell_stdout("git rev-parse --git-path hooks")
+    hooks_path = utils.shell_stdout(["git", "rev-parse", "--git-path", "hooks"])
     pre_commit_hook = os.path.join(hooks_path, "pre-commit")
     if not no_verify and os.path.exists(pre_commit_hook):
-        result = utils.shell(pre_commit_hook, check=False)
+        try:
+            result = utils.shell([pre_commit_hook], check=False)
+        except OSError as exc:
+            if exc.errno != errno.ENOEXEC:
+                raise
+
+            # Like git, run hooks without a shebang line with the shell
+            result = utils.shell(["sh", pre_commit_hook], check=False)
+
         if result.returncode:
             return result
 
     # If there are no staged changes and we are not allowing empty
     # commits (the default git commit mode), short circuit and run
     # a failing git commit
-    staged_changes = utils.shell_stdout("git diff --cached")
+    staged_changes = utils.shell_stdout(["git", "diff", "--cached"])
     if not staged_changes and not allow_empty:
-        return utils.shell("git commit --no-verify", check=False)
+        return utils.shell(["git", "commit", "--no-verify"], check=False)
 
     schema = _load_commit_schema(full=False)
     entry = schema.prompt(defaults=defaults)
@@ -643,15 +1065,12 @@ def commit(no_verify=False, allow_empty=False, defaults=None) -> subprocess.Comp
 
     commit_msg = commit_msg.strip()
 
-    # Commit with git
-    commit_cmd = "git commit --no-verify"
+    # Commit with git, reading the message from stdin
+    commit_cmd = ["git", "commit", "--no-verify"]
     if allow_empty:
-        commit_cmd += " --allow-empty"
-    with tempfile.NamedTemporaryFile(mode="w+") as commit_file:
-        commit_file.write(commit_msg)
-        commit_file.flush()
+        commit_cmd.append("--allow-empty")
 
-        return utils.shell(f"{commit_cmd} -F {commit_file.name}", check=False)
+    return utils.shell([*commit_cmd, "-F", "-"], check=False, input=commit_msg.encode())
 
 
 def lint(range="", any=False) -> tuple[bool, CommitRange]:
@@ -659,11 +1078,12 @@ def lint(range="", any=False) -> tuple[bool, CommitRange]:
     Lint commits against an upstream (branch, sha, etc).
 
     Args:
-        range (str, default=''): The git revision range against which linting
-            happens. The special value of ":github/pr" can be used to lint
-            against the remote branch of the pull request that is opened
-            from the local branch. No range means linting will happen against
-            all commits.
+        range (str|Sequence[str], default=''): The git revision range against
+            which linting happens. The special value of ":github/pr" can be
+            used to lint against the remote branch of the pull request that
+            is opened from the local branch. No range means linting will
+            happen against all commits. A sequence is passed to
+            ``git log`` as separate arguments.
         any (bool, default=False): If True, linting will pass if at least
             one commit passes.
 
@@ -677,10 +1097,18 @@ def lint(range="", any=False) -> tuple[bool, CommitRange]:
         A tuple of the lint result (True/False) and the associated CommitRange
     """
     commits = CommitRange(range=range)
+
+    # Commits are parsed on access, so stop parsing once the result is known
     if not any:
-        return not commits.filter("is_valid", False), commits
+        return all(commit.is_valid for commit in commits), commits
     else:
-        return bool(commits.filter("is_valid", True)), commits
+        return next((True for commit in commits if commit.is_valid), False), commits
+
+
+@functools.lru_cache(maxsize=None)
+def _get_default_log_template():
+    """Returns the compiled default log template"""
+    return jinja2.Template(DEFAULT_LOG_TEMPLATE, trim_blocks=True)
 
 
 def log(
@@ -696,10 +1124,11 @@ def log(
     Renders git logs using tidy rendering.
 
     Args:
-        range (str, default=''): The git revision range over which logs are
-            output. Using ":github/pr" as the range will use the base branch
-            of an open github pull request as the range. No range will result
-            in all commits being logged.
+        range (str|Sequence[str], default=''): The git revision range over
+            which logs are output. Using ":github/pr" as the range will use
+            the base branch of an open github pull request as the range. No
+            range will result in all commits being logged. A sequence is
+            passed to ``git log`` as separate arguments.
         style (str, default="default"): The template to use when rendering.
             Defaults to "default", which means ``.git-tidy/log.tpl`` will
             be used to render. When used, the ``.git-tidy/log_{{style}}.tpl``
@@ -733,19 +1162,22 @@ def log(
         after=after,
         reverse=reverse,
     )
-    env = jinja2.Environment(
-        loader=jinja2.FileSystemLoader(utils.get_tidy_file_root()),
-        trim_blocks=True,
-    )
+    env = _get_template_env(utils.get_tidy_file_root())
     template_file = "log.tpl" if style == "default" else f"log_{style}.tpl"
     try:
         template = env.get_template(template_file)
     except jinja2.exceptions.TemplateNotFound:
         if style == "default":
             # Use the default tidy template if the user didn't provide one
-            template = jinja2.Template(DEFAULT_LOG_TEMPLATE, trim_blocks=True)
+            template = _get_default_log_template()
         else:
             raise
+    # Templates always receive the range as a string
+    if not isinstance(range, str):
+        range = " ".join(range)
+
+    # Render fully before writing so that a failing template leaves the
+    # output untouched
     rendered = template.render(commits=commits, output=output, range=range)
 
     _output(path=output, value=rendered)
@@ -767,8 +1199,8 @@ def squash(ref, no_verify=False, allow_empty=False) -> subprocess.CompletedProce
 
     Raises:
         `NoSquashableCommitsError`: When no commits can be squashed.
-        subprocess.CalledProcessError: If the first ``git reset`` call
-            unexpectedly fails
+        subprocess.CalledProcessError: If finding the common ancestor or the
+            first ``git reset`` call unexpectedly fails
         `NoGithubPullRequestFoundError`: When using ``:github/pr`` as
             the range and no pull requests are found.
         `MultipleGithubPullRequestsFoundError`: When using ``:github/pr`` as
@@ -778,7 +1210,7 @@ def squash(ref, no_verify=False, allow_empty=False) -> subprocess.CompletedProce
         The commit result. The commit result contains either a failed pre-commit hook result or a
         successful/failed commit result.
     """
-    ref = github.get_pull_request_base() if ref == GITHUB_PR else ref
+    ref = _get_pull_request_base() if ref == GITHUB_PR else ref
     range = f"{ref}.."
 
     commits = CommitRange(range=range)
@@ -793,18 +1225,18 @@ def squash(ref, no_verify=False, allow_empty=False) -> subprocess.CompletedProce
     defaults = last_valid_commit.schema_data if last_valid_commit else {}
 
     # Reset to the common ancestor of the ref point
-    common_ancestor = utils.shell_stdout(f"git merge-base {ref} HEAD")
-    utils.shell(f"git reset --soft {common_ancestor}")
+    common_ancestor = utils.shell_stdout(["git", "merge-base", ref, "HEAD"])
+    utils.shell(["git", "reset", "--soft", common_ancestor])
 
     try:
         # Prompt for the new commit message. Reset back to the last point
         # if anything goes wrong
         commit_result = commit(allow_empty=allow_empty, no_verify=no_verify, defaults=defaults)
     except (Exception, KeyboardInterrupt):
-        utils.shell("git reset ORIG_HEAD")
+        utils.shell(["git", "reset", "ORIG_HEAD"])
         raise
 
     if commit_result.returncode != 0:
-        utils.shell("git reset ORIG_HEAD")
+        utils.shell(["git", "reset", "ORIG_HEAD"])
 
     return commit_result
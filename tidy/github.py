@@ -2,7 +2,9 @@
 Utilities for accessing Github
 """
 
+import functools
 import os
+import re
 
 import requests
 
@@ -11,18 +13,39 @@ from tidy import exceptions, utils
 GITHUB_API_TOKEN_ENV_VAR = "GITHUB_API_TOKEN"
 GITHUB_USERNAME_ENV_VAR = "GITHUB_USERNAME"
 
+# Parses the org and repo names from SSH and HTTPS remote URLs
+_REMOTE_URL_RE = re.compile(r"[:/](?P<org>[^/:]+)/(?P<repo>[^/]+?)(\.git)?/?$")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_session():
+    """
+    Returns the session shared by all Github API calls so that connections
+    to the API are kept alive and reused
+    """
+    return requests.Session()
+
 
 def get_org_and_repo_name():
-    remote_url = utils.shell_stdout("git remote get-url origin")
+    # The remote is looked up once per working directory
+    return _get_org_and_repo_name(os.getcwd())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_org_and_repo_name(cwd):
+    remote_url = utils.shell_stdout(["git", "remote", "get-url", "origin"])
     if not remote_url:
         raise exceptions.GithubConfigurationError(
             'Must have a remote named "origin" in order to work with Github.'
         )
 
-    org_name, repo_name = remote_url.split(":")[1].split("/")
+    match = _REMOTE_URL_RE.search(remote_url)
+    if not match:
+        raise exceptions.GithubConfigurationError(
+            f'Could not parse the Github org and repo from the "origin" remote "{remote_url}".'
+        )
 
-    assert repo_name.endswith(".git")
-    return org_name, repo_name[0:-4]
+    return match.group("org"), match.group("repo")
 
 
 class GithubClient:
@@ -36,6 +59,7 @@ class GithubClient:
             )
 
         self.api_token = os.environ[GITHUB_API_TOKEN_ENV_VAR]
+        self._auth_headers = {"Authorization": f"token {self.api_token}"}
 
     def _call_api(self, verb, url, **request_kwargs):
         """Perform a github API call
@@ -44,10 +68,10 @@ class GithubClient:
             verb (str): Can be "post", "put", or "get"
             url (str): The base URL with a leading slash for Github API (v3)
         """
-        api = "https://api.github.com{}".format(url)
-        auth_headers = {"Authorization": "token {}".format(self.api_token)}
-        headers = {**auth_headers, **request_kwargs.pop("headers", {})}
-        resp = getattr(requests, verb)(api, headers=headers, **request_kwargs)
+        api = f"https://api.github.com{url}"
+        headers = request_kwargs.pop("headers", None)
+        headers = {**self._auth_headers, **headers} if headers else self._auth_headers
+        resp = getattr(_get_session(), verb)(api, headers=headers, **request_kwargs)
         resp.raise_for_status()
         return resp
 
@@ -64,6 +88,12 @@ class GithubClient:
         return self._call_api("patch", url, **request_kwargs)
 
 
+@functools.lru_cache(maxsize=None)
+def _get_client():
+    """Returns the `GithubClient` shared by the Github helpers"""
+    return GithubClient()
+
+
 def get_pull_request():
     """Find the pull request in github
 
@@ -73,11 +103,20 @@ def get_pull_request():
             opened from the current branch
     """
     org_name, repo_name = get_org_and_repo_name()
-    current_branch = utils.shell_stdout("git --no-pager branch | grep \\* | cut -d ' ' -f2")
+    current_branch = utils.shell_stdout(["git", "rev-parse", "--abbrev-ref", "HEAD"])
+    return _get_branch_pull_request(org_name, repo_name, current_branch)
 
+
+@functools.lru_cache(maxsize=None)
+def _get_branch_pull_request(org_name, repo_name, current_branch):
+    """
+    Find the pull request opened from a branch. Pull requests are only looked
+    up once per process, so finding the pull request base and commenting on
+    the pull request only need one API call
+    """
     try:
         prs = (
-            GithubClient()
+            _get_client()
             .get(f"/repos/{org_name}/{repo_name}/pulls" f"?head={org_name}:{current_branch}")
             .json()
         )
@@ -128,14 +167,19 @@ def comment(message):
 
     # Try to find a comment already created so that it can be edited
     pr_comments_url = f"/repos/{org_name}/{repo_name}/issues/{pr_number}/comments"
-    pr_comments = GithubClient().get(pr_comments_url).json()
-    pr_comment_id = None
-    for pr_comment in pr_comments:
-        if pr_comment["user"]["login"] == github_username:
-            pr_comment_id = pr_comment["id"]
+    client = _get_client()
+    pr_comments = client.get(f"{pr_comments_url}?per_page=100").json()
+    pr_comment_id = next(
+        (
+            pr_comment["id"]
+            for pr_comment in pr_comments
+            if pr_comment["user"]["login"] == github_username
+        ),
+        None,
+    )
 
     if pr_comment_id:
         comment_edit_url = f"/repos/{org_name}/{repo_name}/issues/comments/{pr_comment_id}"
-        GithubClient().patch(comment_edit_url, json={"body": message})
+        client.patch(comment_edit_url, json={"body": message})
     else:
-        GithubClient().post(pr_comments_url, json={"body": message})
+        client.post(pr_comments_url, json={"body": message})
@@ -1,3 +1,4 @@
+import runpy
 import sys
 from unittest import mock
 
@@ -28,6 +29,17 @@ def test_tidy(mocker, capsys):
     assert out.startswith("git-tidy ")
 
 
+@pytest.mark.usefixtures("mock_successful_exit")
+def test_tidy_main(mocker, capsys):
+    """Test running git-tidy with ``python -m tidy``"""
+    mocker.patch.object(sys, "argv", ["tidy"])
+
+    runpy.run_module("tidy", run_name="__main__")
+
+    out, _ = capsys.readouterr()
+    assert out.startswith("git-tidy ")
+
+
 @pytest.mark.usefixtures("mock_successful_exit")
 def test_tidy_template(mocker, capsys):
     """Test calling git-tidy with the "--template" option"""
@@ -65,12 +77,12 @@ def test_tidy_commit(mock_exit, mocker, command_args, commit_return_code, expect
 @pytest.mark.parametrize(
     "command_args, lint_is_valid, expected_lint_call, expected_stderr",
     [
-        ([], True, mock.call("", any=False), ""),
-        (["range", "--any"], True, mock.call("range", any=True), ""),
+        ([], True, mock.call((), any=False), ""),
+        (["range", "--any"], True, mock.call(("range",), any=True), ""),
         (
             ["range", "--any"],
             False,
-            mock.call("range", any=True),
+            mock.call(("range",), any=True),
             (
                 "2 out of 2 commits have failed linting:\n"
                 "1: ['error1', 'error2']\n2: ['error3', 'error4']\n"
@@ -114,7 +126,7 @@ def test_tidy_lint(
         (  # Verify default parameters are filled out
             [],
             mock.call(
-                "",
+                (),
                 style="default",
                 tag_match=None,
                 before=None,
@@ -135,7 +147,7 @@ def test_tidy_lint(
                 "file",
             ],
             mock.call(
-                "range",
+                ("range",),
                 style="new",
                 tag_match="pattern",
                 before="before",
@@ -186,3 +198,38 @@ def test_tidy_squash(mock_exit, mocker, command_args, squash_return_code, expect
 
     assert patched_squash.call_args_list == [expected_squash_call]
     mock_exit.assert_called_once_with(squash_return_code)
+
+
+def test_tidy_squash_no_args(mocker, capsys):
+    """Test calling git-tidy-squash without a ref is a usage error"""
+    mocker.patch.object(sys, "argv", ["git-tidy-squash"])
+    patched_squash = mocker.patch("tidy.core.squash", autospec=True)
+
+    with pytest.raises(SystemExit) as exc_info:
+        cli.squash()
+
+    assert exc_info.value.code == 2
+    assert "[OPTIONS] REF" in capsys.readouterr().err
+    assert not patched_squash.called
+
+
+@pytest.mark.parametrize(
+    "command, command_args, return_value",
+    [
+        ("commit", [], mock.Mock(returncode=0)),
+        ("lint", ["range"], (True, [])),
+        ("log", ["range"], None),
+        ("squash", ["ref"], mock.Mock(returncode=0)),
+    ],
+)
+@pytest.mark.usefixtures("mock_successful_exit")
+def test_tidy_subcommands(mocker, command, command_args, return_value):
+    """Test calling the tidy commands as subcommands of git-tidy"""
+    mocker.patch.object(sys, "argv", ["git-tidy", command] + command_args)
+    patched_command = mocker.patch(
+        f"tidy.core.{command}", autospec=True, return_value=return_value
+    )
+
+    cli.tidy()
+
+    assert patched_command.call_count == 1
@@ -4,6 +4,8 @@ Most of the test coverage of the core module is from the integration
 tests in tidy/tests/test_integration.py.
 """
 
+import datetime
+import re
 from contextlib import ExitStack as does_not_raise
 from unittest import mock
 
@@ -11,6 +13,14 @@ import pytest
 
 from tidy import core, exceptions
 
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    core._check_git_version.cache_clear()
+    yield
+    core._check_git_version.cache_clear()
+
+
 # A user schema that overrides the default git tidy schema
 overridden_user_schema = """
 - label: type
@@ -93,6 +103,16 @@ def test_load_commit_schema(
     with expected_exception:
         schema = core._load_commit_schema(path=user_schema_file, full=full)
         assert [s["label"] for s in schema] == expected_schema_labels
+        assert core._load_commit_schema(path=user_schema_file, full=full) is schema
+
+
+def test_mtime_ns(tmp_path):
+    """Tests core._mtime_ns()"""
+    path = tmp_path / "file"
+    assert core._mtime_ns(path) is None
+
+    path.write_text("contents")
+    assert core._mtime_ns(path) == path.stat().st_mtime_ns
 
 
 @pytest.mark.parametrize(
@@ -139,15 +159,49 @@ def test_format_commit_attr(mocker, key, value, expected_return):
     assert core._format_commit_attr(key, value) == expected_return
 
 
+@pytest.mark.parametrize(
+    "msg, expected_return",
+    [
+        ("Summary", ("Summary", "")),
+        ("\nSummary\n\nDescription\n\nType: bug\n", ("Summary", "Description\n\nType: bug")),
+        ("Wrapped\nsummary \n\n\nDescription", ("Wrapped summary", "Description")),
+        ("Summary\r\n\r\nDescription\r\n", ("Summary", "Description")),
+        ("Summary\n  \t\nDescription", ("Summary", "Description")),
+        ("Summary\n \nDescription\n\nMore", ("Summary", "Description\n\nMore")),
+    ],
+)
+def test_split_commit_msg(msg, expected_return):
+    """Tests core._split_commit_msg()"""
+    assert core._split_commit_msg(msg) == expected_return
+
+
+@pytest.mark.parametrize(
+    "trailers, expected_return, expected_exception",
+    [
+        ("", [], does_not_raise()),
+        (
+            "Type: bug\nJira: WEB-1: 2\n",
+            [{"Type": " bug"}, {"Jira": " WEB-1: 2"}],
+            does_not_raise(),
+        ),
+        ("Invalid", None, pytest.raises(ValueError)),
+    ],
+)
+def test_parse_trailers(trailers, expected_return, expected_exception):
+    """Tests core._parse_trailers()"""
+    with expected_exception:
+        assert core._parse_trailers(trailers) == expected_return
+
+
 @pytest.mark.parametrize(
     "sha, tag_match, git_describe_output, expected_git_call, expected_tag_value",
     [
-        ("sha1", None, "0.1~8", "git describe sha1 --contains", "0.1"),
+        ("sha1", None, "0.1~8", ["git", "describe", "sha1", "--contains"], "0.1"),
         (
             "sha1",
             "pattern",
             "",
-            "git describe sha1 --contains --match=pattern",
+            ["git", "describe", "sha1", "--contains", "--match=pattern"],
             "None",
         ),
     ],
@@ -172,25 +226,216 @@ def test_tag_from_sha(
 
 
 @pytest.mark.parametrize(
-    "git_log_output, expected_git_log_call, expected_date",
-    [("", mock.call("git log -1 --format=%ad 2.1"), None)],
+    "commit_obj, expected_date",
+    [
+        (None, None),
+        (
+            b"tree 123\nauthor Name <a@b.com> 1578348811 -0600\n\nmsg",
+            datetime.datetime(
+                2020, 1, 6, 16, 13, 31, tzinfo=datetime.timezone(-datetime.timedelta(hours=6))
+            ),
+        ),
+        (
+            b"tree 123\nauthor Name <a@b.com> 1578348811 +0530\n\nmsg",
+            datetime.datetime(
+                2020,
+                1,
+                7,
+                3,
+                43,
+                31,
+                tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30)),
+            ),
+        ),
+        (b"tree 123\n\nauthor Name <a@b.com> 1578348811 -0600", None),
+    ],
 )
-def test_tag_date(mocker, git_log_output, expected_git_log_call, expected_date):
+@pytest.mark.parametrize("shared_cat_file", [True, False])
+def test_tag_date(mocker, commit_obj, expected_date, shared_cat_file):
     """Tests core.Tag.date()"""
-    patched_shell = mocker.patch(
-        "tidy.utils.shell_stdout", autospec=True, return_value=git_log_output
+    patched_read = mocker.patch.object(
+        core._CatFileBatch, "read", autospec=True, return_value=commit_obj
     )
-    tag = core.Tag("2.1")
+    tag = core.Tag("2.1", cat_file=core._CatFileBatch() if shared_cat_file else None)
 
     assert tag.date == expected_date
     assert tag.date == expected_date  # Run twice to exercise caching
-    assert patched_shell.call_args_list == [expected_git_log_call]
+    assert patched_read.call_args_list == [mock.call(mock.ANY, "2.1^{commit}")]
+
+
+def test_commit_private_attribute():
+    """Tests missing private attributes of core.Commit don't parse the commit"""
+    commit = core.Commit({}, schema=None)
+
+    with pytest.raises(AttributeError):
+        commit._missing  # noqa
+
+    assert "_parsed" not in vars(commit)
+
+
+@pytest.mark.parametrize(
+    "a, b, match, expected_return",
+    [
+        ("bug", "bug", False, True),
+        ("bugfix", "bug", False, False),
+        ("bugfix", "bug", True, True),
+        ("a bug", "bug", True, False),
+        ("WEB-1111", r"WEB-\d+", True, True),
+        ("WEB-INVALID", r"WEB-\d+", True, False),
+        (None, "bug", True, False),
+        ("Summary [skip ci]", re.compile(r".*\[skip ci\]"), True, True),
+    ],
+)
+def test_equals(a, b, match, expected_return):
+    """Tests core._equals()"""
+    assert core._equals(a, b, match=match) == expected_return
+
+
+def test_git_bytecode_cache(tmp_path, mocker):
+    """Tests core._GitBytecodeCache only resolves its directory when used"""
+    patched_shell_stdout = mocker.patch(
+        "tidy.utils.shell_stdout", autospec=True, return_value="../.git/tidy-jinja-cache"
+    )
+    cache = core._GitBytecodeCache(str(tmp_path / ".git-tidy"))
+    assert not patched_shell_stdout.called
+
+    assert cache.directory == str(tmp_path / ".git-tidy" / "../.git/tidy-jinja-cache")
+    assert (tmp_path / ".git" / "tidy-jinja-cache").is_dir()
+    patched_shell_stdout.assert_called_once_with(
+        ["git", "rev-parse", "--git-path", "tidy-jinja-cache"], cwd=str(tmp_path / ".git-tidy")
+    )
+
+
+def test_commits_cached():
+    """Tests core.Commits queries are memoized"""
+    commits = core.Commits([mock.Mock(type="bug"), mock.Mock(type="feature")])
+
+    assert commits.filter("type", "bug") is commits.filter("type", "bug")
+    assert commits.exclude("type", "bug") is commits.exclude("type", "bug")
+    assert commits.filter("type", "bug") is not commits.filter("type", "bug", match=True)
+
+    groups = commits.group("type")
+    assert list(groups) == ["bug", "feature"]
+    assert groups["bug"] is commits.group("type")["bug"]
+
+    # Modifying the returned groups does not modify the cache
+    groups.pop("bug")
+    assert list(commits.group("type")) == ["bug", "feature"]
+
+    # Unhashable values are not cached
+    assert len(commits.filter("type", ["bug"])) == 0
+    assert commits.filter("type", ["bug"]) is not commits.filter("type", ["bug"])
+
+
+def test_commits_cached_error():
+    """Tests errors in core.Commits queries are raised without re-running them"""
+    commits = core.Commits([mock.Mock()])
+    compute = mock.Mock(side_effect=TypeError)
+
+    with pytest.raises(TypeError):
+        commits._cached(("query",), compute)
+
+    assert compute.call_count == 1
+
+
+def test_commits_column():
+    """Tests core.Commits looks up an attribute once for all queries on it"""
+    commit = mock.Mock()
+    commit_type = mock.PropertyMock(return_value="bug")
+    type(commit).type = commit_type
+    commits = core.Commits([commit])
+
+    assert list(commits.filter("type", "bug")) == [commit]
+    assert list(commits.exclude("type", "feature")) == [commit]
+    assert list(commits.group("type")) == ["bug"]
+    assert commit_type.call_count == 1
+
+
+# The environment of a Github Actions job run
+github_job_env = {
+    "GITHUB_REPOSITORY": "org/repo",
+    "GITHUB_REF": "refs/pull/1/merge",
+    "GITHUB_RUN_ID": "100",
+    "GITHUB_RUN_ATTEMPT": "1",
+    "GITHUB_JOB": "lint",
+}
+github_job_key = "org/repo refs/pull/1/merge 100 1 lint"
+
+
+@pytest.mark.parametrize(
+    "environment, cached_contents, expected_api_calls, expected_contents",
+    [
+        # Outside of Github Actions, the base is not stored
+        ({}, None, 2, None),
+        # The base is stored on the first lookup
+        (github_job_env, None, 1, f"{github_job_key}\norigin/develop"),
+        # The stored base is used when it was stored for the same job run
+        (
+            github_job_env,
+            f"{github_job_key}\norigin/stored",
+            0,
+            f"{github_job_key}\norigin/stored",
+        ),
+        # Bases stored for other pull requests, other runs, or in a bad
+        # format are ignored
+        (
+            github_job_env,
+            "org/repo refs/pull/2/merge 100 1 lint\norigin/stored",
+            1,
+            f"{github_job_key}\norigin/develop",
+        ),
+        (
+            github_job_env,
+            "org/repo refs/pull/1/merge 99 1 lint\norigin/stored",
+            1,
+            f"{github_job_key}\norigin/develop",
+        ),
+        (github_job_env, "invalid", 1, f"{github_job_key}\norigin/develop"),
+    ],
+)
+def test_get_pull_request_base(
+    mocker, tmp_path, environment, cached_contents, expected_api_calls, expected_contents
+):
+    """Tests core._get_pull_request_base"""
+    mocker.patch.dict("os.environ", environment, clear=True)
+    cache_path = tmp_path / "tidy-pr-base"
+    if cached_contents:
+        cache_path.write_text(cached_contents)
+    mocker.patch("tidy.utils.shell_stdout", autospec=True, return_value=str(cache_path))
+    patched_api = mocker.patch(
+        "tidy.github.get_pull_request_base",
+        autospec=True,
+        return_value="origin/develop",
+    )
+
+    expected_base = expected_contents.split("\n")[1] if expected_contents else "origin/develop"
+    assert core._get_pull_request_base() == expected_base
+    assert core._get_pull_request_base() == expected_base  # Run twice to read the stored base
+    assert patched_api.call_count == expected_api_calls
+    if expected_contents:
+        assert cache_path.read_text() == expected_contents
+    else:
+        assert not cache_path.exists()
+
+
+def test_get_pull_request_base_unwritable(mocker, tmp_path):
+    """Tests core._get_pull_request_base when the base can't be stored"""
+    mocker.patch.dict("os.environ", github_job_env, clear=True)
+    # A directory can't be opened as a file, like a read-only git directory
+    mocker.patch("tidy.utils.shell_stdout", autospec=True, return_value=str(tmp_path))
+    mocker.patch(
+        "tidy.github.get_pull_request_base",
+        autospec=True,
+        return_value="origin/develop",
+    )
+
+    assert core._get_pull_request_base() == "origin/develop"
 
 
 def test_get_pull_request_range(mocker):
     """Tests core._get_pull_request_range"""
     mocker.patch(
-        "tidy.github.get_pull_request_base",
+        "tidy.core._get_pull_request_base",
         autospec=True,
         return_value="develop",
     )
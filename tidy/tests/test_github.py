@@ -15,6 +15,15 @@ def setup_github_env_vars(monkeypatch):
     monkeypatch.setenv("GITHUB_API_TOKEN", "github_token")
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    github._get_org_and_repo_name.cache_clear()
+    github._get_branch_pull_request.cache_clear()
+    yield
+    github._get_org_and_repo_name.cache_clear()
+    github._get_branch_pull_request.cache_clear()
+
+
 @pytest.mark.parametrize(
     "git_origin, expected_org_name, expected_repo_name, expected_exception",
     [
@@ -24,7 +33,11 @@ def setup_github_env_vars(monkeypatch):
             "random-repo",
             does_not_raise(),
         ),
+        ("https://github.com/org/repo.git", "org", "repo", does_not_raise()),
+        ("https://github.com/org/repo", "org", "repo", does_not_raise()),
+        ("ssh://git@github.com:22/org/repo.name.git", "org", "repo.name", does_not_raise()),
         ("", None, None, pytest.raises(exceptions.GithubConfigurationError)),
+        ("invalid", None, None, pytest.raises(exceptions.GithubConfigurationError)),
     ],
 )
 def test_get_org_and_repo_name(
@@ -35,12 +48,18 @@ def test_get_org_and_repo_name(
     expected_exception,
 ):
     """Tests github.get_org_and_repo_name()"""
-    mocker.patch("tidy.utils.shell_stdout", return_value=git_origin, autospec=True)
+    patched_shell_stdout = mocker.patch(
+        "tidy.utils.shell_stdout", return_value=git_origin, autospec=True
+    )
     with expected_exception:
         org_name, repo_name = github.get_org_and_repo_name()
         assert org_name == expected_org_name
         assert repo_name == expected_repo_name
 
+        # The remote is only looked up once
+        assert github.get_org_and_repo_name() == (org_name, repo_name)
+        assert patched_shell_stdout.call_count == 1
+
 
 @pytest.mark.parametrize(
     "environment, expected_exception",
@@ -76,6 +95,46 @@ def test_github_client_call_api(mocker, responses):
     assert responses.calls[0].request.headers["additonal"] == "header"
     assert responses.calls[0].request.headers["Authorization"] == "token github_token"
 
+    # Later calls go through the same session and connection pool, and
+    # headers of earlier calls do not persist on the shared session
+    session = github._get_session()
+    adapter = session.get_adapter("https://api.github.com")
+    c._call_api("post", "/url/base")
+
+    assert len(responses.calls) == 2
+    assert github._get_session() is session
+    assert session.get_adapter("https://api.github.com") is adapter
+    assert "additonal" not in responses.calls[1].request.headers
+    assert responses.calls[1].request.headers["Authorization"] == "token github_token"
+
+
+def test_github_client_call_api_error(responses):
+    """Tests GithubClient._call_api() raises on failed calls"""
+    responses.add(responses.GET, "https://api.github.com/url/base", status=404)
+
+    with pytest.raises(requests.HTTPError, match="404 Client Error") as exc_info:
+        github.GithubClient().get("/url/base")
+
+    assert exc_info.value.response.status_code == 404
+
+
+def test_github_client_session(mocker):
+    """Tests GithubClient API calls share one session"""
+    patched_request = mocker.patch.object(requests.Session, "request", autospec=True)
+
+    github.GithubClient().get("/first")
+    github.GithubClient().get("/second")
+
+    assert patched_request.call_count == 2
+    assert patched_request.call_args_list[0][0][0] is patched_request.call_args_list[1][0][0]
+    assert patched_request.call_args_list[0][0][0] is github._get_session()
+
+
+def test_get_client():
+    """Tests github._get_client() returns one shared client"""
+    assert isinstance(github._get_client(), github.GithubClient)
+    assert github._get_client() is github._get_client()
+
 
 def test_github_client_get_patch_post(mocker):
     """Tests GithubClient.get(), patch(), and post() utility methods"""
@@ -120,7 +179,7 @@ def test_get_pull_request(
     mocker, responses, api_return, api_status, expected_pr, expected_exception
 ):
     """Tests github.get_pull_request()"""
-    mocker.patch(
+    patched_shell_stdout = mocker.patch(
         "tidy.utils.shell_stdout",
         autospec=True,
         side_effect=[
@@ -140,6 +199,15 @@ def test_get_pull_request(
     with expected_exception:
         assert github.get_pull_request() == expected_pr
 
+        # The pull request of the branch is only looked up once
+        patched_shell_stdout.side_effect = ["current_branch"]
+        assert github.get_pull_request() == expected_pr
+        assert len(responses.calls) == 1
+
+    assert patched_shell_stdout.call_args_list[1] == mock.call(
+        ["git", "rev-parse", "--abbrev-ref", "HEAD"]
+    )
+
 
 def test_get_pull_request_base(mocker):
     """Tests github.get_pull_request_base()"""
@@ -170,7 +238,7 @@ def test_get_pull_request_base(mocker):
                 mock.call(
                     mock.ANY,
                     "get",
-                    "/repos/org_name/repo_name/issues/10/comments",
+                    "/repos/org_name/repo_name/issues/10/comments?per_page=100",
                 ),
                 mock.call(
                     mock.ANY,
@@ -189,7 +257,7 @@ def test_get_pull_request_base(mocker):
                 mock.call(
                     mock.ANY,
                     "get",
-                    "/repos/org_name/repo_name/issues/10/comments",
+                    "/repos/org_name/repo_name/issues/10/comments?per_page=100",
                 ),
                 mock.call(
                     mock.ANY,
@@ -232,3 +300,27 @@ def test_comment(
         github.comment("message")
 
         assert patched_client_call.call_args_list == expected_client_calls
+
+
+def test_comment_first_match(mocker, monkeypatch, responses):
+    """Tests github.comment() edits the first comment of the user"""
+    monkeypatch.setenv("GITHUB_USERNAME", "user")
+    mocker.patch("tidy.github.get_pull_request", autospec=True, return_value={"number": 10})
+    mocker.patch(
+        "tidy.github.get_org_and_repo_name",
+        autospec=True,
+        return_value=("org_name", "repo_name"),
+    )
+    comments_url = "https://api.github.com/repos/org_name/repo_name/issues/10/comments"
+    responses.add(
+        responses.GET,
+        f"{comments_url}?per_page=100",
+        json=[{"id": 110, "user": {"login": "user"}}, {"id": 111, "user": {"login": "user"}}],
+    )
+    edit_url = "https://api.github.com/repos/org_name/repo_name/issues/comments/110"
+    responses.add(responses.PATCH, edit_url)
+
+    github.comment("message")
+
+    assert [call.request.method for call in responses.calls] == ["GET", "PATCH"]
+    assert json.loads(responses.calls[1].request.body) == {"body": "message"}
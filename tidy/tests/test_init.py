@@ -0,0 +1,15 @@
+"""Tests the lazily-imported tidy package API"""
+
+import pytest
+
+import tidy
+from tidy import core
+
+
+def test_getattr():
+    """Tests the core API is accessible from the tidy package"""
+    assert tidy.CommitRange is core.CommitRange
+    assert tidy.log is core.log
+
+    with pytest.raises(AttributeError, match="invalid"):
+        tidy.invalid  # noqa
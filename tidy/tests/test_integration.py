@@ -1,7 +1,11 @@
 """Integration tests for git-tidy"""
 
+import errno
+import functools
 import io
 import os
+import re
+import subprocess
 from contextlib import ExitStack as does_not_raise
 
 import formaldict
@@ -97,38 +101,145 @@ def tidy_config(tmp_path, mocker):
 
 
 @pytest.fixture()
-def git_tidy_repo(tidy_config):
+def git_tidy_repo(tidy_config, monkeypatch):
     """Create a git repo with structured commits for integration tests"""
-    cwd = os.getcwd()
-    os.chdir(tidy_config)
-
-    utils.shell("git init .")
-    utils.shell("git branch -m master", check=False)
-    utils.shell('git config user.email "you@example.com"')
-    utils.shell('git config user.name "Your Name"')
-    utils.shell(
-        'git commit --allow-empty -m $"Summary1 [skip ci]\n\n'
-        'Description1\n\nType: api-break\nJira: WEB-1111"'
+    shell = functools.partial(utils.shell, cwd=tidy_config)
+
+    shell(["git", "init", "."])
+    shell(["git", "branch", "-m", "master"], check=False)
+    shell(["git", "config", "user.email", "you@example.com"])
+    shell(["git", "config", "user.name", "Your Name"])
+    shell(
+        [
+            "git",
+            "commit",
+            "--allow-empty",
+            "-m",
+            "Summary1 [skip ci]\n\nDescription1\n\nType: api-break\nJira: WEB-1111",
+        ]
     )
-    utils.shell(
-        'git commit --allow-empty -m $"Summary2\n\nDescription2\n\n' 'Type: bug\nJira: WEB-1112"'
+    shell(
+        [
+            "git",
+            "commit",
+            "--allow-empty",
+            "-m",
+            "Summary2\n\nDescription2\n\nType: bug\nJira: WEB-1112",
+        ]
     )
-    utils.shell("git tag v1.1")
-    utils.shell('git commit --allow-empty -m $"Summary3\n\nType: trivial"')
-    utils.shell("git tag dev1.2")
-    utils.shell("git tag v1.2")
-    utils.shell(
-        'git commit --allow-empty -m $"Summary4\n\nDescription4\n\n'
-        'Type: feature\nJira: WEB-1113"'
+    shell(["git", "tag", "v1.1"])
+    shell(["git", "commit", "--allow-empty", "-m", "Summary3\n\nType: trivial"])
+    shell(["git", "tag", "dev1.2"])
+    shell(["git", "tag", "v1.2"])
+    shell(
+        [
+            "git",
+            "commit",
+            "--allow-empty",
+            "-m",
+            "Summary4\n\nDescription4\n\nType: feature\nJira: WEB-1113",
+        ]
     )
-    utils.shell('git commit --allow-empty -m $"Invalid5\n\n' 'Type: feature\nJira: INVALID"')
-    # Create a commit that uses the same delimiter structure as git-tidy
-    # to create a scenario of an unparseable commit.
-    utils.shell('git commit --allow-empty -m $"Invalid6\n\nUnparseable: *{*"')
+    shell(["git", "commit", "--allow-empty", "-m", "Invalid5\n\nType: feature\nJira: INVALID"])
+    # Create a commit with an unknown encoding that git cannot convert to
+    # UTF-8 to create a scenario of an unparseable commit.
+    shell(
+        ["git", "-c", "i18n.commitEncoding=unknown", "commit", "--allow-empty", "-F", "-"],
+        input=b"Invalid6\n\nUnparseable: \xff",
+    )
+
+    # git tidy operates on the repository of the working directory
+    monkeypatch.chdir(tidy_config)
+
+    return tidy_config
+
 
-    yield tidy_config
+def test_cat_file_batch(git_tidy_repo):
+    """Tests core._CatFileBatch reads objects of the repository"""
+    blob_sha = (
+        utils.shell(
+            ["git", "hash-object", "-w", "--stdin"],
+            stdout=subprocess.PIPE,
+            input=b"line1\nline2\n",
+            cwd=git_tidy_repo,
+        )
+        .stdout.decode()
+        .strip()
+    )
+
+    with core._CatFileBatch() as cat_file:
+        assert cat_file.read(blob_sha) == b"line1\nline2\n"
+        commit_obj = cat_file.read("v1.1^{commit}")
+        assert commit_obj.startswith(b"tree ")
+        assert b"\nauthor Your Name <you@example.com> " in commit_obj
+        assert commit_obj.endswith(b"\n\nSummary2\n\nDescription2\n\nType: bug\nJira: WEB-1112\n")
+        assert cat_file.read("invalid-rev") is None
+        # Missing objects don't break reading later objects
+        assert cat_file.read(blob_sha) == b"line1\nline2\n"
+
+    assert cat_file._proc is None
+
+
+def test_git_log(git_tidy_repo, mocker, monkeypatch):
+    """Tests core._git_log() parses the fields of commits"""
+    shell = functools.partial(utils.shell, cwd=git_tidy_repo)
+    monkeypatch.setenv("GIT_AUTHOR_DATE", "2020-01-02T03:04:05+00:00")
+    monkeypatch.setenv("GIT_COMMITTER_DATE", "2020-01-03T04:05:06-06:00")
+    shell(
+        [
+            "git",
+            "commit",
+            "--allow-empty",
+            "-m",
+            "Summary7\n\nDescription7\n\nType: bug\nJira: WEB-1117",
+        ]
+    )
+    shell(
+        [
+            "git",
+            "-c",
+            "user.name=Other Name",
+            "-c",
+            "user.email=other@example.com",
+            "commit",
+            "--allow-empty",
+            "--author",
+            "Author Name <author@example.com>",
+            "-m",
+            "Summary8\n\nA description that spans\nmultiple lines",
+        ]
+    )
+    shas = utils.shell_stdout(["git", "rev-parse", "HEAD", "HEAD~1"]).split("\n")
+
+    # Read a few bytes at a time so that fields span multiple chunks
+    mocker.patch.object(core, "_GIT_LOG_CHUNK_SIZE", 7)
+    assert list(core._git_log(["git", "log", "-2"])) == [
+        {
+            "sha": shas[0].encode(),
+            "author_name": b"Author Name",
+            "author_email": b"author@example.com",
+            "author_date": b"Thu Jan 2 03:04:05 2020 +0000",
+            "committer_name": b"Other Name",
+            "committer_email": b"other@example.com",
+            "committer_date": b"Fri Jan 3 04:05:06 2020 -0600",
+            "msg": b"Summary8\n\nA description that spans\nmultiple lines\n",
+            "trailers": b"",
+        },
+        {
+            "sha": shas[1].encode(),
+            "author_name": b"Your Name",
+            "author_email": b"you@example.com",
+            "author_date": b"Thu Jan 2 03:04:05 2020 +0000",
+            "committer_name": b"Your Name",
+            "committer_email": b"you@example.com",
+            "committer_date": b"Fri Jan 3 04:05:06 2020 -0600",
+            "msg": b"Summary7\n\nDescription7\n\nType: bug\nJira: WEB-1117\n",
+            "trailers": b"Type: bug\nJira: WEB-1117\n",
+        },
+    ]
 
-    os.chdir(cwd)
+    with pytest.raises(subprocess.CalledProcessError):
+        list(core._git_log(["git", "log", "invalid-rev"]))
 
 
 @pytest.mark.usefixtures("git_tidy_repo")
@@ -136,7 +247,7 @@ def test_tidy_log():
     """
     Integration test for tidy-log
     """
-    full_log = utils.shell_stdout("git tidy-log")
+    full_log = utils.shell_stdout(["git", "tidy-log"])
     assert full_log.startswith("# Unreleased")
     assert "Commit could not be parsed." in full_log
     assert "# v1.2" not in full_log  # dev1.2 takes precedence in this case
@@ -162,7 +273,7 @@ def test_commit_properties_and_range_filtering(mocker):
     assert not invalid_commit.is_valid
     with pytest.raises(AttributeError):
         invalid_commit.invalid_attribute  # noqa
-    assert invalid_commit.msg.startswith("sha: ")
+    assert invalid_commit.msg.endswith("Jira: INVALID")
     assert invalid_commit.jira is None
     assert invalid_commit.tag is None
 
@@ -176,6 +287,7 @@ def test_commit_properties_and_range_filtering(mocker):
     assert len(cr.filter("is_parsed", False)) == 1
     assert len(cr.filter("type", "feature").filter("is_valid", True)) == 1
     assert len(cr.filter("summary", r".*\[skip ci\].*", match=True)) == 1
+    assert len(cr.filter("summary", re.compile(r".*\[skip ci\].*"), match=True)) == 1
     assert len(cr.exclude("summary", r".*\[skip ci\].*", match=True)) == 5
 
     # Check groupings
@@ -224,6 +336,18 @@ def test_commit_properties_and_range_filtering(mocker):
     cr = core.CommitRange(tag_match="v*")
     assert set(cr.group("tag")) == {None, "v1.1", "v1.2"}
 
+    # Tags are found for the whole range at once and match "git describe"
+    mocker.patch.object(core._ContainingTags, "batch_size", 4)
+    for tag_match in [None, "v*"]:
+        cr = core.CommitRange(tag_match=tag_match)
+        for commit in cr:
+            expected_tag = core.Tag.from_sha(commit.sha, tag_match=tag_match)
+            assert commit.tag == expected_tag
+            assert core.Commit(commit._fields, cr._schema, tag_match=tag_match).tag == expected_tag
+
+        assert cr[0].tag is None
+        assert cr[-1].tag is cr[-2].tag
+
     # Try before/after filtering
     assert not list(core.CommitRange(before="2019-01-01"))
     assert len(core.CommitRange(after="2019-01-01")) == 6
@@ -239,6 +363,15 @@ def test_commit_properties_and_range_filtering(mocker):
     assert len(cr) == 6
 
 
+@pytest.mark.usefixtures("git_tidy_repo")
+def test_commit_range_fetch_error():
+    """Tests core.CommitRange raises when remotes cannot be fetched"""
+    utils.shell(["git", "remote", "add", "origin", "/does/not/exist"])
+
+    with pytest.raises(subprocess.CalledProcessError):
+        core.CommitRange()
+
+
 @pytest.mark.parametrize(
     "input_data",
     [
@@ -295,7 +428,7 @@ def test_commit(mocker, input_data):
     with open("file_to_commit", "w+") as f:
         f.write("Hello World")
 
-    utils.shell("git add .")
+    utils.shell(["git", "add", "."])
     assert core.commit().returncode == 0
 
     commit = core.CommitRange("HEAD~1..")[0]
@@ -320,11 +453,13 @@ def test_empty_commit_not_allowed():
 
 
 @pytest.mark.parametrize("pre_commit_return", [1, 0])
+# Like git, hooks without a shebang line are run with the shell
+@pytest.mark.parametrize("shebang", ["#!/bin/bash\n", ""])
 @pytest.mark.usefixtures("git_tidy_repo")
-def test_commit_w_pre_commit_hook(pre_commit_return, mocker):
+def test_commit_w_pre_commit_hook(pre_commit_return, shebang, mocker):
     """Tests core.commit() with a pre commit hook"""
     with open(".git/hooks/pre-commit", "w+") as f:
-        f.write(f"#!/bin/bash\nexit {pre_commit_return}")
+        f.write(f"{shebang}exit {pre_commit_return}")
     os.chmod(".git/hooks/pre-commit", 0o777)
 
     mocker.patch.object(
@@ -342,14 +477,28 @@ def test_commit_w_pre_commit_hook(pre_commit_return, mocker):
     assert core.commit(allow_empty=True).returncode == pre_commit_return
 
 
-@pytest.mark.parametrize("any", [True, False])
 @pytest.mark.usefixtures("git_tidy_repo")
-def test_lint(any):
+def test_commit_w_pre_commit_hook_error():
+    """Tests core.commit() raises errors other than hooks without a shebang"""
+    with open(".git/hooks/pre-commit", "w+") as f:
+        f.write("#!/bin/bash\nexit 0")
+    os.chmod(".git/hooks/pre-commit", 0o644)
+
+    with pytest.raises(PermissionError):
+        core.commit(allow_empty=True)
+
+
+@pytest.mark.parametrize("any, expected_parsed", [(True, 3), (False, 1)])
+@pytest.mark.usefixtures("git_tidy_repo")
+def test_lint(any, expected_parsed):
     """Tests core.lint()"""
     passed, commits = core.lint(any=any)
     assert passed == any
     assert len(commits) == 6
 
+    # Linting stops parsing commits once the result is known
+    assert sum("_parsed" in vars(commit) for commit in commits) == expected_parsed
+
 
 @pytest.mark.parametrize("output", [None, "output_file", io.StringIO(), ":github/pr"])
 @pytest.mark.usefixtures("git_tidy_repo")
@@ -360,11 +509,11 @@ def test_log(output, mocker):
 
     if isinstance(output, str) and output != ":github/pr":
         with open(output) as f:
-            rendered = f.read()
+            assert f.read() == rendered
     elif output == ":github/pr":
-        assert patched_github.called
+        patched_github.assert_called_once_with(rendered)
     elif output is not None:
-        rendered = output.getvalue()
+        assert output.getvalue() == rendered
 
     assert rendered.startswith("# Unreleased")
     assert "Commit could not be parsed" in rendered
@@ -372,6 +521,16 @@ def test_log(output, mocker):
     assert "## Api-Break" in rendered
 
 
+@pytest.mark.parametrize("range", ["HEAD~2.. --reverse", ("HEAD~2..", "--reverse")])
+@pytest.mark.usefixtures("git_tidy_repo")
+def test_log_range(range):
+    """Tests core.log() with string and argument sequence ranges"""
+    with open(".git-tidy/log_range.tpl", "w+") as f:
+        f.write("{{ range }}: {{ commits[0].type }}, {{ commits|length }}")
+
+    assert core.log(range, style="range") == "HEAD~2.. --reverse: feature, 2"
+
+
 @pytest.mark.parametrize(
     "style, expected_exception",
     [
@@ -419,6 +578,75 @@ def test_tidy_template():
     )
 
 
+@pytest.mark.usefixtures("git_tidy_repo")
+def test_tidy_template_memoized(tidy_config):
+    """Tests core.commit_template() is re-rendered only when its files change"""
+    template_path = tidy_config / ".git-tidy" / "commit.tpl"
+    template_path.write_text("{{ schema.type.help }}")
+    assert core.commit_template() == "The type of change."
+
+    # Edits that keep the modification time are not seen
+    stat = template_path.stat()
+    template_path.write_text("{{ schema.jira.help }}")
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert core.commit_template() == "The type of change."
+
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert core.commit_template() == "Jira Ticket ID."
+
+
+@pytest.mark.usefixtures("git_tidy_repo")
+def test_log_output_error(tidy_config):
+    """Tests a failing log template leaves the output file untouched"""
+    (tidy_config / ".git-tidy" / "log_error.tpl").write_text(
+        "{% for commit in commits %}{{ commit.sha }}\n{% endfor %}{{ undefined.attr }}"
+    )
+    output = tidy_config / "out.md"
+    output.write_text("previous")
+
+    with pytest.raises(jinja2.exceptions.UndefinedError):
+        core.log(style="error", output=str(output))
+
+    assert output.read_text() == "previous"
+
+
+@pytest.mark.usefixtures("git_tidy_repo")
+def test_log_template_cached(tidy_config):
+    """Tests core.log() reuses compiled templates until their files change"""
+    template_path = tidy_config / ".git-tidy" / "log_cached.tpl"
+    template_path.write_text("{{ commits|length }} commits")
+    assert core.log(style="cached") == "6 commits"
+    assert core._get_template_env(str(tidy_config / ".git-tidy")) is core._get_template_env(
+        str(tidy_config / ".git-tidy")
+    )
+
+    # Compiled templates are also stored in the git directory for later runs
+    assert list((tidy_config / ".git" / "tidy-jinja-cache").iterdir())
+
+    stat = template_path.stat()
+    template_path.write_text("{{ range }} commits")
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert core.log("HEAD~1..", style="cached") == "HEAD~1.. commits"
+
+
+@pytest.mark.usefixtures("git_tidy_repo")
+@pytest.mark.parametrize("unwritable", ["directory", "file"])
+def test_log_template_cache_unwritable(tidy_config, mocker, unwritable):
+    """Tests core.log() still renders when compiled templates cannot be stored"""
+    if unwritable == "directory":
+        # A file in place of the cache directory makes it impossible to create
+        (tidy_config / ".git" / "tidy-jinja-cache").write_text("")
+    else:
+        mocker.patch(
+            "jinja2.bccache.tempfile.NamedTemporaryFile",
+            autospec=True,
+            side_effect=PermissionError(errno.EACCES, "Permission denied"),
+        )
+
+    (tidy_config / ".git-tidy" / "log_cached.tpl").write_text("{{ commits|length }} commits")
+    assert core.log(style="cached") == "6 commits"
+
+
 @pytest.mark.usefixtures("git_tidy_repo")
 def test_squash(mocker):
     """Tests core.squash"""
@@ -458,12 +686,12 @@ def test_squash(mocker):
         with open(f_name, "w+") as f:
             f.write("Hello World")
 
-        utils.shell("git add .")
+        utils.shell(["git", "add", "."])
         assert core.commit().returncode == 0
 
     assert core.squash("HEAD~2").returncode == 0
 
-    commit = utils.shell_stdout("git show --summary")
+    commit = utils.shell_stdout(["git", "show", "--summary"])
     assert (
         "    final summary\n"
         "    \n"
@@ -518,29 +746,33 @@ def test_squash_diverging_branches(mocker):
     core.commit(allow_empty=True)
 
     # Make a branch that we will squash
-    utils.shell("git branch test-squash")
+    utils.shell(["git", "branch", "test-squash"])
 
     # Now commit against the base branch (i.e. make it diverge)
     core.commit(allow_empty=True)
 
     # Change branches and do a few more commits that will be squashed
-    utils.shell("git checkout test-squash")
+    utils.shell(["git", "checkout", "test-squash"])
 
     core.commit(allow_empty=True)
     core.commit(allow_empty=True)
 
     assert core.squash("master", allow_empty=True).returncode == 0
 
-    commits = utils.shell_stdout("git --no-pager log")
+    # Only summaries are read from the whole history since the fixture has
+    # a commit message that isn't UTF-8
+    summaries = utils.shell_stdout(["git", "--no-pager", "log", "--format=%s"])
 
     # These commits disappeared when squashing
-    assert "Fixing up something" not in commits
+    assert "Fixing up something" not in summaries
+    # The divergent commit should not appear in history
+    assert "wont be seen" not in summaries
     # First commit against master should be in log
-    assert "first master commit" in commits
+    first_master_commit = utils.shell_stdout(["git", "--no-pager", "log", "-1", "HEAD~1"])
+    assert "first master commit" in first_master_commit
     # Squashed commit should be in log
-    assert "final description" in commits
-    # The divergent commit should not appear in history
-    assert "wont be seen" not in commits
+    squashed_commit = utils.shell_stdout(["git", "--no-pager", "log", "-1"])
+    assert "final description" in squashed_commit
 
 
 @pytest.mark.usefixtures("git_tidy_repo")
@@ -573,14 +805,14 @@ def test_squash_error_rollback(mocker):
     with open("file_to_commit", "w+") as f:
         f.write("Hello World")
 
-    utils.shell("git add .")
+    utils.shell(["git", "add", "."])
     assert core.commit().returncode == 0
 
     # The first squash call throws an unexpected error and rolls back the reset
     with pytest.raises(Exception, match=""):
         core.squash("HEAD~1")
 
-    assert utils.shell_stdout("git diff --cached") == ""
+    assert utils.shell_stdout(["git", "diff", "--cached"]) == ""
 
     # Make commit return a non-zero exit code on next squash commit
     mocker.patch(
@@ -591,4 +823,4 @@ def test_squash_error_rollback(mocker):
 
     # The next squash call has a commit error and rolls back the reset
     assert core.squash("HEAD~1").returncode == 1
-    assert utils.shell_stdout("git diff --cached") == ""
+    assert utils.shell_stdout(["git", "diff", "--cached"]) == ""
@@ -1,16 +1,38 @@
 """Tests the tidy.utils() module"""
 
+import subprocess
+
+import pytest
+
 from tidy import utils
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    utils._get_tidy_file_root.cache_clear()
+    yield
+    utils._get_tidy_file_root.cache_clear()
+
+
 def test_shell_stdout():
     """Tests utils.shell_stdout()"""
     assert utils.shell_stdout('echo "hello world"') == "hello world"
 
 
+def test_shell_input():
+    """Tests utils.shell() with input sent to stdin"""
+    result = utils.shell(["cat"], stdout=subprocess.PIPE, input=b"hello world")
+    assert result.stdout == b"hello world"
+
+
+def test_shell_cwd(tmp_path):
+    """Tests utils.shell_stdout() runs commands in another directory"""
+    assert utils.shell_stdout(["pwd"], cwd=tmp_path) == str(tmp_path)
+
+
 def test_get_tidy_file_root(mocker):
     """Tests utils.get_tidy_file_root()"""
-    mocker.patch(
+    patched_shell_stdout = mocker.patch(
         "tidy.utils.shell_stdout",
         autospec=True,
         # Return value for "git rev-parse --show-toplevel" call
@@ -19,6 +41,10 @@ def test_get_tidy_file_root(mocker):
 
     assert utils.get_tidy_file_root() == "/work/git-tidy/.git-tidy"
 
+    # The root is only looked up once per working directory
+    assert utils.get_tidy_file_root() == "/work/git-tidy/.git-tidy"
+    assert patched_shell_stdout.call_count == 1
+
 
 def test_get_tidy_file_path(mocker):
     """Tests utils.get_tidy_file_path()"""
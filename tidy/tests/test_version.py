@@ -0,0 +1,10 @@
+"""Tests the tidy.version module"""
+
+from importlib import metadata
+
+from tidy import version
+
+
+def test_version():
+    """Verify the version matches the installed package metadata"""
+    assert version.__version__ == metadata.version("git-tidy")
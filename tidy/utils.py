@@ -2,18 +2,34 @@
 Utilities for git tidy
 """
 
+import functools
 import os
+import shlex
 import subprocess
 
 
-def shell(cmd, check=True, stdin=None, stdout=None, stderr=None):
-    """Runs a subprocess shell with check=True by default"""
-    return subprocess.run(cmd, shell=True, check=check, stdin=stdin, stdout=stdout, stderr=stderr)
+def shell(cmd, check=True, stdin=None, stdout=None, stderr=None, input=None, cwd=None):
+    """Runs a subprocess with check=True by default
 
-
-def shell_stdout(cmd, check=True, stdin=None, stderr=None):
-    """Runs a shell command and returns stdout"""
-    ret = shell(cmd, stdout=subprocess.PIPE, check=check, stdin=stdin, stderr=stderr)
+    Commands are executed directly without an intermediate shell. String
+    commands are split into arguments with shell-like syntax.
+    ``input`` is sent to the command's stdin. ``cwd`` runs the command in
+    another directory without changing the working directory of the process.
+    """
+    return subprocess.run(
+        shlex.split(cmd) if isinstance(cmd, str) else cmd,
+        check=check,
+        stdin=stdin,
+        stdout=stdout,
+        stderr=stderr,
+        input=input,
+        cwd=cwd,
+    )
+
+
+def shell_stdout(cmd, check=True, stdin=None, stderr=None, cwd=None):
+    """Runs a command and returns stdout"""
+    ret = shell(cmd, stdout=subprocess.PIPE, check=check, stdin=stdin, stderr=stderr, cwd=cwd)
     return ret.stdout.decode("utf-8").strip() if ret.stdout else ""
 
 
@@ -21,7 +37,13 @@ def get_tidy_file_root():
     """
     Get the root path of tidy files
     """
-    top_level = shell_stdout("git rev-parse --show-toplevel")
+    # The git root is looked up once per working directory
+    return _get_tidy_file_root(os.getcwd())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tidy_file_root(cwd):
+    top_level = shell_stdout(["git", "rev-parse", "--show-toplevel"])
     return os.path.join(top_level, ".git-tidy")
 
 
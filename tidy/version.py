@@ -1,3 +1,3 @@
-from importlib import metadata
-
-__version__ = metadata.version("git-tidy")
+# The version is kept in sync with pyproject.toml so that it can be
+# looked up without reading the package metadata at runtime
+__version__ = "1.3.0"